@@ -0,0 +1,4 @@
+
+# Code to replicate the study "The State of Environmental and Resource Economics: An OpenAlex Perspective"
+# Importing the package or any of its modules does not query OpenAlex or write files;
+# run the analyses with the command line interface: python -m ere_openalex --help
@@ -0,0 +1,151 @@
+
+import time
+from functools import lru_cache
+
+# Match designated terms against the 'abstract_inverted_index' API field of OpenAlex works.
+# OpenAlex does not return abstracts as plain text but as a map of token -> positions,
+# e.g. {"Contingent": [0], "valuation": [1], "is": [2], ...}.
+# Rebuilding the abstract string for every work is costly across whole-journal crawls,
+# so the terms are checked directly on the token -> positions map instead.
+# The matching follows the same rule as the other fields: a case-insensitive substring
+# search, here on the abstract with punctuation stripped from each token (and from each word
+# of the terms, so "U.S." is searched as "u.s").
+
+_PUNCTUATION = ".,;:!?()[]{}\"'“”‘’«»"
+
+
+# Normalize the tokens of an inverted index: lower case and punctuation stripped,
+# so that "Pay." and "pay" share the same positions
+def normalize_inverted_index(inverted_index):
+    normalized = {}
+    for token, positions in inverted_index.items():
+        key = token.lower().strip(_PUNCTUATION)
+        if not key:
+            continue
+        if key in normalized:
+            normalized[key] = normalized[key] + positions
+        else:
+            normalized[key] = positions
+    return normalized
+
+
+# Lower-cased words of a term with punctuation stripped as from the tokens,
+# cached since the same few terms are checked for every work
+@lru_cache(maxsize=None)
+def _split_term(term):
+    words = (word.strip(_PUNCTUATION) for word in term.lower().split())
+    return tuple(word for word in words if word)
+
+
+# Positions of all tokens ending (or starting) with a word
+def _positions(normalized, word, ending):
+    positions = set()
+    for token, token_positions in normalized.items():
+        if word in token and (token.endswith(word) if ending else token.startswith(word)):
+            positions.update(token_positions)
+    return positions
+
+
+# Check a single- or multi-word term such as "willingness to pay" against a normalized index.
+# Single words match any token containing them. For phrases the first word must end a token,
+# the middle words must be whole tokens and the last word must start a token, at adjacent positions.
+def term_in_index(normalized, term):
+    words = _split_term(term)
+    if not words:
+        return False
+    if len(words) == 1:
+        return any(words[0] in token for token in normalized)
+
+    first, middle, last = words[0], words[1:-1], words[-1]
+    starts = _positions(normalized, first, ending=True)
+    if not starts:
+        return False
+    for offset, word in enumerate(middle, 1):
+        following = normalized.get(word)
+        if not following:
+            return False
+        starts &= {position - offset for position in following}
+        if not starts:
+            return False
+    ends = _positions(normalized, last, ending=False)
+    offset = len(words) - 1
+    return any(start + offset in ends for start in starts)
+
+
+# Return the designated terms found in the abstract of a work.
+# Every word of a term has to appear somewhere in the lower-cased token list, which is one
+# cheap substring search; single words are decided by that search alone, and the index is
+# only normalized (once per work) for phrases whose words are all present
+def match_abstract_terms(work, terms):
+    inverted_index = work.get('abstract_inverted_index')
+    if not inverted_index:
+        return []
+    vocabulary = "\n".join(inverted_index).lower()
+    normalized = None
+
+    matched = []
+    for term in terms:
+        words = _split_term(term)
+        if len(words) == 1:
+            if words[0] in vocabulary:
+                matched.append(term)
+            continue
+        if not words or not all(word in vocabulary for word in words):
+            continue
+        if normalized is None:
+            normalized = normalize_inverted_index(inverted_index)
+        if term_in_index(normalized, term):
+            matched.append(term)
+    return matched
+
+
+# Rebuild the abstract text from the inverted index (only used for the benchmark below)
+def reconstruct_abstract(inverted_index):
+    words = {}
+    for token, positions in inverted_index.items():
+        for position in positions:
+            words[position] = token
+    return " ".join(words[position] for position in sorted(words))
+
+
+# Reconstruct-then-search, the straightforward way of matching terms in abstracts
+def match_reconstructed_terms(work, terms):
+    inverted_index = work.get('abstract_inverted_index')
+    if not inverted_index:
+        return []
+    text = " ".join(word.strip(_PUNCTUATION) for word in reconstruct_abstract(inverted_index).lower().split())
+    return [term for term in terms if _split_term(term) and " ".join(_split_term(term)) in text]
+
+
+# Compare the time of both approaches on the same works and check that they agree
+def benchmark(works, terms, repeat=3):
+    timings = {}
+    matches = {}
+    for name, matcher in [('inverted_index', match_abstract_terms), ('reconstruct', match_reconstructed_terms)]:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = [matcher(work, terms) for work in works]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        matches[name] = found
+
+    mismatches = sum(1 for a, b in zip(matches['inverted_index'], matches['reconstruct']) if a != b)
+    works_with_abstract = sum(1 for work in works if work.get('abstract_inverted_index'))
+    print(f"Works: {len(works)}, with abstract: {works_with_abstract}")
+    print(f"Inverted index matching: {timings['inverted_index']:.3f} s")
+    print(f"Reconstruct-then-search: {timings['reconstruct']:.3f} s")
+    print(f"Works with different matches: {mismatches}")
+    return timings, mismatches
+
+
+# Benchmark on a full journal
+def benchmark_journal(journal_id, terms):
+    from . import api
+
+    works = api.fetch_all(api.base_url, {
+        "filter": f"primary_location.source.id:{journal_id}",
+        "select": "id,abstract_inverted_index"
+    })
+    return benchmark(works, terms)
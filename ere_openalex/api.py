@@ -0,0 +1,187 @@
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .coalescing import fetch_once
+from .profiling import profiled
+
+# Requests to the OpenAlex API shared by all analyses
+
+base_url = "https://api.openalex.org/works"
+
+# Create a session with retries
+session = requests.Session()
+retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+session.mount('http://', HTTPAdapter(max_retries=retries))
+session.mount('https://', HTTPAdapter(max_retries=retries))
+
+headers = {'Accept-Encoding': 'identity'}
+
+
+# Send the OpenAlex 'mailto' parameter with every request (polite pool)
+def set_mailto(mailto):
+    session.params['mailto'] = mailto
+
+
+# Raised by the strict fetches when a page could not be fetched
+class FetchError(Exception):
+    pass
+
+
+# Fetch the results of all pages of a query with cursor paging, up to 'limit' results
+# Add delay between pages to avoid issues caused by frequent requests
+# A failed page ends the query with the results fetched so far, or raises FetchError if strict
+# (the queue workers fetch strictly, so that a failed job is retried instead of completed with partial results)
+def fetch_all(url, params, limit=None, delay=1, strict=False):
+    params = dict(params, **{"per-page": 200, "cursor": "*"})
+
+    results = []
+    while limit is None or len(results) < limit:
+        try:
+            response = session.get(url, params=params, headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                if 'results' in data:
+                    results.extend(data['results'])
+                next_cursor = data.get('meta', {}).get('next_cursor')
+                print(f"Next cursor: {next_cursor}")  # Print cursor value for debugging
+                if next_cursor:
+                    params['cursor'] = next_cursor  # Update cursor for the next page
+                else:
+                    break  # End loop when no more data is available
+            else:
+                print(f"Failed to fetch data: {response.status_code}")
+                print("Error response:", response.text)  # Print detailed error information
+                if strict:
+                    raise FetchError(f"{response.status_code} from {response.url}")
+                break
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {e}")
+            if strict:
+                raise FetchError(f"Request failed: {e}") from e
+            break
+
+        time.sleep(delay)
+
+    return results if limit is None else results[:limit]
+
+
+# Number of works matching a filter, without fetching them
+def count_works(filter_):
+    response = session.get(base_url, params={"filter": filter_, "per-page": 1, "select": "id"}, headers=headers)
+    response.raise_for_status()
+    return response.json()['meta']['count']
+
+
+# Fetch all works of a journal
+# field is 'primary_location.source.id', or 'locations.source.id' to include works
+# whose other locations are in the journal
+@profiled
+def get_works(journal_id, field="primary_location.source.id", delay=1, strict=False):
+    return fetch_all(base_url, {"filter": f"{field}:{journal_id}"}, delay=delay, strict=strict)
+
+
+# Fetch the most cited works of a journal
+@profiled
+def get_top_cited_works(journal_id, limit, strict=False):
+    params = {
+        "filter": f"primary_location.source.id:{journal_id}",
+        "sort": "cited_by_count:desc",
+    }
+    return fetch_all(base_url, params, limit=limit, strict=strict)
+
+
+# Fetch citation data for a work
+# extra_filter is added to the 'cites:' filter of the API URL, e.g. "from_publication_date:2024-01-01",
+# and select limits the fields returned for each citing work, e.g. "id,publication_year"
+@profiled
+def get_cited_by_data(cited_by_api_url, extra_filter=None, select=None, strict=False):
+    params = {}
+    if extra_filter:
+        cited_by_api_url, _, cites_filter = cited_by_api_url.partition('?filter=')
+        params['filter'] = f"{cites_filter},{extra_filter}"
+    if select:
+        params['select'] = select
+    return fetch_all(cited_by_api_url, params, strict=strict)
+
+
+# Fetch authors' information of a work
+# A work asked for several times is only fetched once per run
+# A failed request is not kept, so a later call fetches the work again; it returns no authors,
+# or raises FetchError if strict
+@profiled
+def get_authors_info(work_id, strict=False):
+    try:
+        return fetch_once(('authors_info', work_id), lambda: _fetch_authors_info(work_id))
+    except FetchError:
+        if strict:
+            raise
+        return []
+
+
+def _fetch_authors_info(work_id):
+    try:
+        response = session.get(f"{base_url}/{work_id}")
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed: {e}")
+        raise FetchError(f"Request failed: {e}") from e
+    if response.status_code == 200:
+        data = response.json()
+        authors_info = []
+        for author in data.get('authorships', []):
+            author_name = author.get('author', {}).get('display_name', 'N/A')
+            author_url = author.get('author', {}).get('id', 'N/A')
+            authors_info.append({"author_name": author_name, "author_url": author_url})
+        return authors_info
+    else:
+        print(f"Failed to fetch data for {work_id}: {response.status_code}")
+        raise FetchError(f"{response.status_code} from {response.url}")
+
+
+# Fetch the IDs of an author's publications (only the 'id' field, which keeps the pages small)
+# Identical author queries are coalesced
+@profiled
+def get_author_work_ids(author_id, strict=False):
+    return fetch_once(
+        ('author_work_ids', author_id, strict),
+        lambda: [work['id'] for work in fetch_all(base_url, {"filter": f"authorships.author.id:{author_id}", "select": "id"}, strict=strict)]
+    )
+
+
+# Fetch the full records of works by ID, 100 IDs per request (the most an OR filter takes)
+# Works of a failed request or unknown to OpenAlex are missing from the results, and their IDs
+# are printed; if strict, a failed request raises FetchError instead
+@profiled
+def get_works_by_ids(work_ids, delay=1, strict=False):
+    works = []
+    work_ids = list(dict.fromkeys(work_ids))
+    for start in range(0, len(work_ids), 100):
+        batch = work_ids[start:start + 100]
+        params = {
+            "filter": "openalex:" + "|".join(work_id.split('/')[-1] for work_id in batch),
+            "per-page": 100
+        }
+        try:
+            response = session.get(base_url, params=params, headers=headers)
+            if response.status_code == 200:
+                works.extend(response.json().get('results', []))
+            else:
+                print(f"Failed to fetch data: {response.status_code}")
+                print("Error response:", response.text)
+                if strict:
+                    raise FetchError(f"{response.status_code} from {response.url}")
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {e}")
+            if strict:
+                raise FetchError(f"Request failed: {e}") from e
+
+        time.sleep(delay)
+
+    fetched = {work['id'].split('/')[-1] for work in works}
+    missing = [work_id for work_id in work_ids if work_id.split('/')[-1] not in fetched]
+    if missing:
+        print(f"{len(missing)} of {len(work_ids)} works not fetched: {', '.join(missing)}")
+    return works
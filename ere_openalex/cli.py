@@ -0,0 +1,282 @@
+
+import argparse
+import sys
+
+# Command line interface: python -m ere_openalex <command> ...
+# Each command imports what it needs when it runs: requests only for the commands
+# querying OpenAlex, and pandas/openpyxl only for those reading or writing Excel files.
+
+
+def mean_citations(args):
+    from . import mean_citations
+    sorted_papers = mean_citations.rank_by_citations(mean_citations.fetch_journal_works(args.journal_id))
+
+    # Print the first 10 records for validation
+    for i, result in enumerate(sorted_papers[:10], 1):
+        print(f"{i}: {result['id']} {result['cited_by_count']} {result['title']}")
+
+    if args.output:
+        from . import excel
+        excel.write_rows(sorted_papers, args.output)
+        print("Excel export is finished")
+
+    for n in args.top:
+        total, average = mean_citations.top_citations(sorted_papers, n)
+        print(f"Top {n} cited_by_count_total：", total)
+        print(f"Top {n} cited_by_count_average：", average)
+
+
+def time_window(args):
+    from . import study, time_window
+    if args.years is None:
+        args.years = study.years
+    if args.incremental:
+        results = time_window.update_statistics(args.journal_id, args.incremental, args.years, args.since_field)
+    else:
+        results = time_window.calculate(args.journal_id, args.years)
+
+    from . import excel
+    excel.write_rows(results, args.output)
+    print(f"Results saved to {args.output}")
+
+
+def general_journal(args):
+    from . import general_journals
+    filtered_works = general_journals.filtered_top_cited_works(args.journal_id, args.keywords, args.include_abstract)
+
+    from . import excel
+    excel.write_rows(filtered_works, args.output)
+    print(f"Filtered works saved to {args.output}")
+
+
+def author_list(args):
+    from . import excel, top_authors
+    results = top_authors.author_list(excel.read_column(args.input_file, 'id'))
+    if results:
+        excel.write_rows(results, args.output, sheet_name="Authors Info")
+    print(f"Results saved to {args.output}")
+
+
+def top_authors(args):
+    from . import excel, top_authors
+    ranking = top_authors.rank_authors(excel.read_rows(args.input_file), args.keywords, args.top, args.include_abstract)
+    excel.write_sheets([(author['author_name'], author['filtered_works']) for author in ranking], args.output)
+    print(f"Top {args.top} authors' results saved to {args.output}")
+    # Then manually filter each author's publication in ERE fields:
+    # 1. To look at an author's 20/25/30 most highly cited works in ERE fields
+    # 2. Exclude citation counts in the textbooks for undergrads and popular science
+    # 3. Exclude papers in science journals
+
+
+def sp_rp(args):
+    from . import sp_rp
+    keyword_counts, yearly_stats = sp_rp.classify_journal(args.journal_id, args.include_abstract)
+
+    from . import excel
+    excel.write_rows(keyword_counts, args.works_output)
+    print(f"the results of all works are saved as {args.works_output}")
+    excel.write_yearly_stats(yearly_stats, args.yearly_output)
+    print(f"the annual combined results are saved as {args.yearly_output}")
+
+
+def combine(args):
+    from . import excel
+    if args.analysis == 'time-window':
+        excel.combine_time_window(args.folder, args.output or 'combined_time_window.xlsx')
+    elif args.analysis == 'general-journals':
+        excel.combine_general_journals(args.folder, args.output or 'combined_papers_general_economics.xlsx')
+    else:
+        excel.combine_sp_rp(args.folder, args.output)
+
+
+# Number of works matching an OpenAlex filter, e.g. primary_location.source.id:S4306500963
+def count(args):
+    from . import api
+    print(api.count_works(args.filter))
+
+
+def run_pipeline(args):
+    from . import pipeline, study
+    stages = study.build_stages()
+    if args.status:
+        for name, state in pipeline.status(stages, args.cache_dir).items():
+            print(f"{name}\t{state}")
+        return
+    pipeline.run(stages, args.cache_dir, args.workers, args.only, args.force)
+
+
+# State and size of the saved pipeline outputs, without running anything
+def cache(args):
+    import os
+    from . import pipeline, study
+    for name, state in pipeline.status(study.build_stages(), args.cache_dir).items():
+        output_path = os.path.join(args.cache_dir, f"{name}.json")
+        size = os.path.getsize(output_path) / 1e6 if os.path.exists(output_path) else 0
+        print(f"{name:20} {state:8} {size:10.2f} MB")
+
+
+def queue(args):
+    import json
+    from . import job_queue, worker
+
+    if args.queue_command == 'work':
+        done = worker.work(args.db, args.kinds, args.max_jobs, args.exit_when_idle, args.lease_seconds)
+        print(f"Jobs done: {done}")
+        return
+
+    conn = job_queue.connect(args.db)
+    if args.queue_command == 'enqueue':
+        payload = json.loads(args.payload)
+        if args.follow:
+            payload['follow'] = True
+        for key in args.keys:
+            job_queue.enqueue(conn, args.kind, key, payload, args.max_attempts)
+        print(f"Enqueued {len(args.keys)} {args.kind} jobs")
+    elif args.queue_command == 'status':
+        for kind, status, count in job_queue.stats(conn):
+            print(f"{kind}\t{status}\t{count}")
+    elif args.queue_command == 'requeue-failed':
+        print(f"Requeued {job_queue.requeue_failed(conn, args.kinds)} jobs")
+    elif args.queue_command == 'export':
+        count = 0
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            for key, result in job_queue.iter_results(conn, args.kind):
+                f.write(json.dumps({'key': key, 'result': result}) + "\n")
+                count += 1
+        print(f"{count} results saved to {args.output_file}")
+    conn.close()
+
+
+def benchmark_abstracts(args):
+    from . import abstract_matching, keywords
+    terms = args.terms or keywords.stated_preference_keywords + keywords.revealed_preference_keywords + keywords.ere_keywords
+    abstract_matching.benchmark_journal(args.journal_id, terms)
+
+
+def profile_diff(args):
+    import json
+    from . import profiling
+    with open(args.old, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+    print(profiling.diff_reports(old, new))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ere_openalex', description="The State of Environmental and Resource Economics: An OpenAlex Perspective")
+    parser.add_argument('--mailto', help="e-mail address for the OpenAlex polite pool")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Journal ids can be found in OpenAlex API
+    command = commands.add_parser('mean-citations', help="total and mean citations of a journal's top cited works")
+    command.add_argument('journal_id')
+    command.add_argument('--output', help="Excel file of all works ranked by citations")
+    command.add_argument('--top', type=int, nargs='+', default=[500, 1000])
+    command.set_defaults(func=mean_citations)
+
+    command = commands.add_parser('time-window', help="top 100/500 total and mean citations of a journal by year")
+    command.add_argument('journal_id')
+    command.add_argument('output')
+    command.add_argument('--years', type=int, nargs='+', help="default: the years of the study, from the current year back to 1994 (study.py)")
+    command.add_argument('--incremental', metavar='STATE_FILE', help="update the previous run saved in this file (one per journal)")
+    command.add_argument('--since-field', default='from_publication_date', choices=['from_publication_date', 'from_updated_date'])
+    command.set_defaults(func=time_window)
+
+    command = commands.add_parser('general-journal', help="ERE works among a general economics journal's top cited works")
+    command.add_argument('journal_id')
+    command.add_argument('output')
+    command.add_argument('--keywords', nargs='+')
+    command.add_argument('--include-abstract', action='store_true')
+    command.set_defaults(func=general_journal)
+
+    command = commands.add_parser('author-list', help="authors of the works listed in the 'id' column of all sheets")
+    command.add_argument('input_file')
+    command.add_argument('output')
+    command.set_defaults(func=author_list)
+
+    command = commands.add_parser('top-authors', help="rank the authors of an author list by citations in ERE fields")
+    command.add_argument('input_file')
+    command.add_argument('output')
+    command.add_argument('--top', type=int, default=30)
+    command.add_argument('--keywords', nargs='+')
+    command.add_argument('--include-abstract', action='store_true')
+    command.set_defaults(func=top_authors)
+
+    command = commands.add_parser('sp-rp', help="stated versus revealed preference works of a journal")
+    command.add_argument('journal_id')
+    command.add_argument('works_output')
+    command.add_argument('yearly_output')
+    command.add_argument('--include-abstract', action='store_true')
+    command.set_defaults(func=sp_rp)
+
+    command = commands.add_parser('combine', help="combine the Excel results of all journals in a folder")
+    command.add_argument('analysis', choices=['time-window', 'general-journals', 'sp-rp'])
+    command.add_argument('folder')
+    command.add_argument('output', nargs='?')
+    command.set_defaults(func=combine)
+
+    command = commands.add_parser('count', help="number of works matching an OpenAlex filter")
+    command.add_argument('filter')
+    command.set_defaults(func=count)
+
+    command = commands.add_parser('pipeline', help="run the stages of the study, skipping those that are current")
+    command.add_argument('--cache-dir', default='pipeline_cache')
+    command.add_argument('--only', nargs='*', help="run only these stages and the stages they depend on")
+    command.add_argument('--force', nargs='*', default=[], help="rerun these stages even if they are current")
+    command.add_argument('--workers', type=int, default=4, help="number of stages run at the same time")
+    command.add_argument('--status', action='store_true', help="show which stages are current and exit")
+    command.set_defaults(func=run_pipeline)
+
+    command = commands.add_parser('cache', help="show the state and size of the saved pipeline outputs")
+    command.add_argument('--cache-dir', default='pipeline_cache')
+    command.set_defaults(func=cache)
+
+    command = commands.add_parser('queue', help="crawl with several workers sharing one job queue")
+    command.add_argument('--db', required=True, help="path of the queue database, on a shared filesystem for several hosts")
+    queue_commands = command.add_subparsers(dest='queue_command', required=True)
+    queue_command = queue_commands.add_parser('enqueue', help="add jobs")
+    queue_command.add_argument('kind', choices=['top_cited_works', 'cited_by', 'general_journal', 'author_works', 'sp_rp_journal', 'echo'])
+    queue_command.add_argument('keys', nargs='+', help="journal, work or author IDs")
+    queue_command.add_argument('--payload', default='{}', help="JSON options of the jobs")
+    queue_command.add_argument('--follow', action='store_true', help="enqueue the cited_by jobs of top_cited_works")
+    queue_command.add_argument('--max-attempts', type=int, default=5)
+    queue_command = queue_commands.add_parser('work', help="run a worker")
+    queue_command.add_argument('--kinds', nargs='*', help="only run these kinds of jobs")
+    queue_command.add_argument('--max-jobs', type=int)
+    queue_command.add_argument('--exit-when-idle', action='store_true')
+    queue_command.add_argument('--lease-seconds', type=int, default=600)
+    queue_commands.add_parser('status', help="count jobs by kind and status")
+    queue_command = queue_commands.add_parser('requeue-failed', help="retry failed jobs")
+    queue_command.add_argument('--kinds', nargs='*')
+    queue_command = queue_commands.add_parser('export', help="write the results of a kind as JSON lines")
+    queue_command.add_argument('kind')
+    queue_command.add_argument('output_file')
+    command.set_defaults(func=queue)
+
+    command = commands.add_parser('benchmark-abstracts', help="compare abstract matching with reconstruct-then-search on a journal")
+    command.add_argument('journal_id')
+    command.add_argument('--terms', nargs='+')
+    command.set_defaults(func=benchmark_abstracts)
+
+    command = commands.add_parser('profile-diff', help="compare two profiling reports (see OPENALEX_PROFILE)")
+    command.add_argument('old')
+    command.add_argument('new')
+    command.set_defaults(func=profile_diff)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'keywords', False) is None:
+        from .keywords import ere_keywords
+        args.keywords = ere_keywords
+    if args.mailto:
+        from . import api
+        api.set_mailto(args.mailto)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+
+import threading
+
+# Single-flight request coalescing
+# Identical queries (same key) share one call: a caller asking for a key that is
+# already being fetched waits for that fetch instead of starting its own, and the
+# result is kept for the rest of the run so the key is never fetched twice.
+
+_lock = threading.Lock()
+_in_flight = {}  # key -> threading.Event set when the fetch is finished
+_results = {}  # key -> result of the finished fetch
+
+
+# Return fetch() for the key, calling fetch at most once per run for each key
+def fetch_once(key, fetch):
+    with _lock:
+        if key in _results:
+            return _results[key]
+        event = _in_flight.get(key)
+        owner = event is None
+        if owner:
+            event = threading.Event()
+            _in_flight[key] = event
+
+    if not owner:
+        event.wait()
+        with _lock:
+            if key in _results:
+                return _results[key]
+        # The owner failed, so try again
+        return fetch_once(key, fetch)
+
+    try:
+        result = fetch()
+        with _lock:
+            _results[key] = result
+        return result
+    finally:
+        with _lock:
+            del _in_flight[key]
+        event.set()
+
+
+# Forget all stored results, e.g. between two runs in the same process
+def clear():
+    with _lock:
+        _results.clear()
@@ -0,0 +1,174 @@
+
+import os
+
+import pandas as pd
+
+from .profiling import profiled
+
+# Reading and writing Excel files
+# This is the only module importing pandas and openpyxl, and it is only imported on the
+# paths that read or write Excel files, so the other commands start without them.
+
+
+def _make_folder(output_file):
+    folder = os.path.dirname(output_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+
+# Save rows (a list of dicts) as an Excel file
+@profiled('excel_export')
+def write_rows(rows, output_file, sheet_name=None):
+    _make_folder(output_file)
+    df = pd.DataFrame(rows)
+    if sheet_name:
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+    else:
+        df.to_excel(output_file, index=False)
+
+
+# Unique sheet names for the names given, in the same order
+# Sheet names cannot exceed 31 characters or contain []:*?/\, and are compared case-insensitively;
+# repeated names (e.g. two authors with the same name) get a suffix: "Name", "Name (2)", ...
+def _sheet_names(names):
+    used = set()
+    result = []
+    for name in names:
+        name = ''.join('_' if char in '[]:*?/\\' else char for char in str(name)) or "Sheet"
+        sheet_name = name[:31]
+        number = 1
+        while sheet_name.lower() in used:
+            number += 1
+            suffix = f" ({number})"
+            sheet_name = name[:31 - len(suffix)] + suffix
+        used.add(sheet_name.lower())
+        result.append(sheet_name)
+    return result
+
+
+# Save several lists of rows as the sheets of one Excel file
+# sheets is a list of (sheet name, rows) pairs; empty lists are skipped
+@profiled('excel_export')
+def write_sheets(sheets, output_file):
+    _make_folder(output_file)
+    sheets = [(name, rows) for name, rows in sheets if rows]
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        for sheet_name, (name, rows) in zip(_sheet_names(name for name, rows in sheets), sheets):
+            pd.DataFrame(rows).to_excel(writer, index=False, sheet_name=sheet_name)
+
+
+# Save the number of SP and RP works by year
+@profiled('excel_export')
+def write_yearly_stats(yearly_stats, output_file):
+    _make_folder(output_file)
+    pd.DataFrame(yearly_stats).T.sort_index().to_excel(output_file)
+
+
+# Values of a column in all sheets of an Excel file
+def read_column(input_file, column):
+    values = []
+    for sheet_name, df in pd.read_excel(input_file, sheet_name=None).items():
+        print(f"Processing sheet: {sheet_name}")
+        values.extend(df[column].tolist())
+    return values
+
+
+# Rows of the first sheet of an Excel file as dicts
+def read_rows(input_file):
+    return pd.read_excel(input_file).to_dict('records')
+
+
+# Merge all journals' time window files together, one sheet per statistic
+@profiled
+def combine_time_window(folder_path, output_file):
+    all_files = [f for f in os.listdir(folder_path) if f.endswith('.xlsx')]
+    data_dict = {
+        'total_100': pd.DataFrame(),
+        'average_100': pd.DataFrame(),
+        'total_500': pd.DataFrame(),
+        'average_500': pd.DataFrame(),
+        'actual_count_100': pd.DataFrame(),
+        'actual_count_500': pd.DataFrame(),
+    }
+
+    for file in all_files:
+        file_path = os.path.join(folder_path, file)
+        df = pd.read_excel(file_path)
+        file_name = os.path.splitext(file)[0]
+
+        if 'year' not in df.columns:
+            continue
+
+        for column in data_dict.keys():
+            if column in df.columns:
+                if data_dict[column].empty:
+                    data_dict[column]['year'] = df['year']
+                data_dict[column][file_name] = df[column]
+
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+        for sheet_name, data in data_dict.items():
+            data.to_excel(writer, sheet_name=sheet_name, index=False)
+    print(f"Data combined and saved to {output_file}")
+
+
+# Rank all works from the general economics journals filtered by keywords
+@profiled
+def combine_general_journals(input_folder, output_file):
+    excel_files = [f for f in os.listdir(input_folder) if f.endswith('.xlsx')]
+
+    combined_df = pd.DataFrame()
+    for file in excel_files:
+        df = pd.read_excel(os.path.join(input_folder, file))
+        df['source_name'] = file.split('_')[0]
+        df = df.sort_values(by='cited_by_count', ascending=False)
+        combined_df = pd.concat([combined_df, df])
+
+    combined_df.to_excel(output_file, index=False)
+    print(f"Combined data saved to {output_file}")
+
+
+# Combine the yearly SP and RP results of all journals in the directory
+@profiled
+def combine_sp_rp(directory_path, output_file=None):
+    # Initialize an empty DataFrame to store the aggregated data
+    summary_df = pd.DataFrame()
+
+    # Iterate through all files in the directory
+    for filename in os.listdir(directory_path):
+        if "_total_keywords" in filename and filename.endswith(".xlsx"):
+            file_path = os.path.join(directory_path, filename)
+            df = pd.read_excel(file_path)
+
+            # Check if the DataFrame is empty
+            if df.empty:
+                print(f" {filename} is empty，skip the file")
+                continue
+
+            # Ensure column names are consistent
+            df.columns = ['year', 'stated_preference_higher', 'revealed_preference_higher']
+
+            # If 'summary_df' is empty, assign the value directly
+            if summary_df.empty:
+                summary_df = df
+            else:
+                # Aggregate the data by year
+                summary_df = pd.merge(summary_df, df, on='year', how='outer', suffixes=('', '_dup'))
+
+                # Combine the data in the columns
+                summary_df['stated_preference_higher'] = summary_df[
+                    ['stated_preference_higher', 'stated_preference_higher_dup']].sum(axis=1, skipna=True)
+                summary_df['revealed_preference_higher'] = summary_df[
+                    ['revealed_preference_higher', 'revealed_preference_higher_dup']].sum(axis=1, skipna=True)
+
+                # Remove unnecessary duplicate columns
+                summary_df.drop(columns=['stated_preference_higher_dup', 'revealed_preference_higher_dup'], inplace=True)
+
+    # Check if 'summary_df' is empty
+    if summary_df.empty:
+        print("No valid _total_keywords files found or all files are empty")
+    else:
+        # Save results as new Excel file
+        output_path = output_file or os.path.join(directory_path, "SP vs RP.xlsx")
+        summary_df.to_excel(output_path, index=False)
+        print(f"The aggregated results have been saved to {output_path}")
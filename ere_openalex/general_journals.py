@@ -0,0 +1,20 @@
+
+from . import api
+from .keywords import filter_works_by_keywords
+
+# Works on ERE topics among the most cited works of general economics journals
+
+# Fetch the top 800 most cited works of each journal
+# Why not fetching all works: fetching top 800 is enough for the identification
+# of top 20 most cited papers in general economics journals
+top_works = 800
+
+
+def filtered_top_cited_works(journal_id, keywords, include_abstract=False, strict=False):
+    print("Fetching top cited works...")
+    works = api.get_top_cited_works(journal_id, top_works, strict)
+    print(f"Total works fetched: {len(works)}")
+
+    filtered_works = filter_works_by_keywords(works, keywords, include_abstract)
+    print(f"Total filtered works: {len(filtered_works)}")
+    return filtered_works
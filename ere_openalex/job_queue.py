@@ -0,0 +1,203 @@
+
+import json
+import os
+import socket
+import sqlite3
+import time
+
+# File-backed job queue for crawling with several worker processes or machines
+# The queue is one SQLite file; put it on a shared filesystem to let several hosts pull from it.
+# (SQLite relies on file locks, so the shared filesystem must support them, e.g. NFSv4 or SMB.)
+#
+# - A job is identified by its kind and key, e.g. ('author_works', 'A5023888391'),
+#   so enqueueing the same job twice does nothing.
+# - A worker claims a job with a lease. If the worker dies, the lease expires and
+#   another worker takes the job over.
+# - A failed job is retried after a growing delay until max_attempts is reached.
+# - Results are written once per job ID; a second write of the same job (e.g. after
+#   a lease expired while the first worker was still busy) is ignored.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    worker TEXT,
+    written_at REAL
+);
+"""
+
+
+# Open (and create if needed) the queue database
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Name of this worker process, unique across hosts
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def job_id_for(kind, key):
+    return f"{kind}:{key}"
+
+
+# Add a job, ignoring it if a job of the same kind and key exists already
+def enqueue(conn, kind, key, payload=None, max_attempts=5):
+    conn.execute(
+        "INSERT OR IGNORE INTO jobs (job_id, kind, key, payload, max_attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (job_id_for(kind, key), kind, str(key), json.dumps(payload or {}), max_attempts, time.time())
+    )
+    return job_id_for(kind, key)
+
+
+# Claim the next available job: pending ones whose retry delay is over,
+# and leased ones whose lease has expired. Returns None when nothing is available
+# A job whose lease expired on its last attempt (e.g. its worker keeps crashing on it) is failed
+def claim(conn, worker, kinds=None, lease_seconds=600):
+    now = time.time()
+    kind_filter = ""
+    params = [now, now]
+    if kinds:
+        kind_filter = f"AND kind IN ({', '.join('?' for _ in kinds)})"
+        params.extend(kinds)
+
+    # BEGIN IMMEDIATE takes the write lock, so two workers never claim the same job
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            """UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires = NULL,
+                   last_error = 'lease expired on the last attempt', updated_at = ?
+               WHERE status = 'leased' AND lease_expires <= ? AND attempts >= max_attempts""",
+            (now, now)
+        )
+        row = conn.execute(
+            f"""SELECT * FROM jobs
+                WHERE ((status = 'pending' AND available_at <= ?)
+                       OR (status = 'leased' AND lease_expires <= ?))
+                {kind_filter}
+                ORDER BY available_at, job_id LIMIT 1""",
+            params
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """UPDATE jobs SET status = 'leased', attempts = attempts + 1,
+                   lease_owner = ?, lease_expires = ?, updated_at = ?
+               WHERE job_id = ?""",
+            (worker, now + lease_seconds, now, row['job_id'])
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['attempts'] += 1
+    return job
+
+
+# Extend the lease of a job the worker still holds, returns False if the lease was lost
+def renew_lease(conn, job_id, worker, lease_seconds=600):
+    now = time.time()
+    cursor = conn.execute(
+        "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+        (now + lease_seconds, now, job_id, worker)
+    )
+    return cursor.rowcount == 1
+
+
+# Write the result of a job and mark it done
+# The first result written for a job is kept, so writing it again is harmless
+def complete(conn, job_id, worker, result):
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT kind, key FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        conn.execute(
+            "INSERT OR IGNORE INTO results (job_id, kind, key, result, worker, written_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, row['kind'], row['key'], json.dumps(result), worker, now)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, last_error = NULL, updated_at = ? WHERE job_id = ?",
+            (now, job_id)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# Record a failed attempt: retry later with a growing delay, or give up after max_attempts
+def fail(conn, job_id, worker, error, retry_delay=30):
+    now = time.time()
+    conn.execute(
+        """UPDATE jobs SET
+               status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+               available_at = ? + ? * attempts,
+               lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ?
+           WHERE job_id = ? AND lease_owner = ?""",
+        (now, retry_delay, str(error), now, job_id, worker)
+    )
+
+
+# Put failed jobs back in the queue
+def requeue_failed(conn, kinds=None):
+    query = "UPDATE jobs SET status = 'pending', attempts = 0, available_at = 0 WHERE status = 'failed'"
+    params = []
+    if kinds:
+        query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+        params.extend(kinds)
+    return conn.execute(query, params).rowcount
+
+
+# Time at which the next job may become available: the earliest retry of a pending job or
+# expiry of a lease. Returns None when no job is pending or leased, i.e. all jobs are done or failed
+def next_available(conn, kinds=None):
+    query = """SELECT MIN(CASE WHEN status = 'pending' THEN available_at ELSE lease_expires END) AS at, COUNT(*) AS n
+               FROM jobs WHERE status IN ('pending', 'leased')"""
+    params = []
+    if kinds:
+        query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+        params.extend(kinds)
+    row = conn.execute(query, params).fetchone()
+    return row['at'] if row['n'] else None
+
+
+# Number of jobs of each kind and status
+def stats(conn):
+    rows = conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status ORDER BY kind, status")
+    return [(row['kind'], row['status'], row['n']) for row in rows]
+
+
+# Stored result of one job, or None
+def get_result(conn, kind, key):
+    row = conn.execute("SELECT result FROM results WHERE job_id = ?", (job_id_for(kind, key),)).fetchone()
+    return json.loads(row['result']) if row else None
+
+
+# All stored results of a kind, as (key, result) pairs
+def iter_results(conn, kind):
+    for row in conn.execute("SELECT key, result FROM results WHERE kind = ? ORDER BY key", (kind,)):
+        yield row['key'], json.loads(row['result'])
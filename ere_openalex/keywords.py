@@ -0,0 +1,89 @@
+
+from collections import defaultdict
+
+from .abstract_matching import match_abstract_terms
+from .profiling import profiled
+
+# Designated terms and keyword matching
+
+# Terms identifying works in environmental and resource economics (ERE) fields
+ere_keywords = ["Environment", "Environmental", "Pollution", "Energy", "Climate", "Carbon", "Resource", "Resources"]
+
+# Terms of stated preference (SP) and revealed preference (RP) methods
+stated_preference_keywords = [
+    "stated preference", "stated preference methods",
+    "discrete choice models", "conjoint analysis", "contingent valuation", "willingness to pay"
+]
+revealed_preference_keywords = [
+    "revealed preference", "revealed preference methods", "hedonic pricing",
+    "hedonic index", "property values", "house prices"
+]
+
+
+# filter works with designated terms
+# in the API fields of 'title', 'keywords', 'topics', and 'concepts'
+# (and the abstract if include_abstract is True)
+@profiled
+def filter_works_by_keywords(works, keywords, include_abstract=False):
+    filtered_works = []
+    for work in works:
+        title = work.get('title', '')
+        concepts = [concept['display_name'] for concept in work.get('concepts', []) if isinstance(concept['display_name'], str)]
+        keywords_list = [kw for kw in work.get('keywords', []) if isinstance(kw, str)]
+        topics = [topic['display_name'] for topic in work.get('topics', []) if isinstance(topic['display_name'], str)]
+
+        combined_list = concepts + keywords_list + topics + [title]
+
+        if any(keyword.lower() in item.lower() for keyword in keywords for item in combined_list if isinstance(item, str)):
+            filtered_works.append(work)
+        elif include_abstract and match_abstract_terms(work, keywords):
+            filtered_works.append(work)
+    return filtered_works
+
+
+# Count the frequency of the designated terms in 'keywords' and 'concepts' API fields
+# If include_abstract is True, each term found in the abstract counts once more
+def count_keywords(work, keywords, include_abstract=False):
+    count = 0
+    keywords_list = work.get('keywords', [])
+    concepts = work.get('concepts', [])
+
+    for keyword in keywords:
+        for kw in keywords_list:
+            if keyword.lower() in kw['display_name'].lower():
+                count += 1
+        for concept in concepts:
+            if keyword.lower() in concept['display_name'].lower():
+                count += 1
+    if include_abstract:
+        count += len(match_abstract_terms(work, keywords))
+    return count
+
+
+# Compare the counts of designated SP and RP terms.
+# For a publication, if the count of designated SP terms exceeds that of RP terms,
+# it is classified as an SP work, and vice versa.
+@profiled
+def classify_works(works, include_abstract=False):
+    keyword_counts = []
+    yearly_stats = defaultdict(lambda: {'stated_preference_higher': 0, 'revealed_preference_higher': 0})
+
+    for work in works:
+        year = work['publication_year']
+        stated_preference_count = count_keywords(work, stated_preference_keywords, include_abstract)
+        revealed_preference_count = count_keywords(work, revealed_preference_keywords, include_abstract)
+
+        keyword_counts.append({
+            'id': work['id'],
+            'title': work['title'],
+            'year': year,
+            'stated_preference_count': stated_preference_count,
+            'revealed_preference_count': revealed_preference_count
+        })
+
+        if stated_preference_count > revealed_preference_count:
+            yearly_stats[year]['stated_preference_higher'] += 1
+        elif revealed_preference_count > stated_preference_count:
+            yearly_stats[year]['revealed_preference_higher'] += 1
+
+    return keyword_counts, yearly_stats
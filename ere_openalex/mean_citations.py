@@ -0,0 +1,25 @@
+
+from . import api
+
+# Total and mean citations of the most cited works of a journal (at their current citation counts)
+
+
+# Fetch all works of a journal, including the works whose other locations are in the journal
+def fetch_journal_works(journal_id):
+    works = api.get_works(journal_id, field="locations.source.id")
+    print(f"Total results: {len(works)}")
+    return works
+
+
+# Rank papers by citation count
+def rank_by_citations(works):
+    return sorted(works, key=lambda x: x['cited_by_count'], reverse=True)
+
+
+# Calculate the total citations and average citations
+# of the top n most cited papers
+def top_citations(sorted_papers, n):
+    top_papers = sorted_papers[:n] if len(sorted_papers) >= n else sorted_papers
+    total_cited_by_count = sum(paper['cited_by_count'] for paper in top_papers)
+    average_cited_by_count = total_cited_by_count / len(top_papers) if top_papers else 0
+    return total_cited_by_count, average_cited_by_count
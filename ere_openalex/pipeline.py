@@ -0,0 +1,241 @@
+
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import threading
+
+from .profiling import profile_stage
+
+# Small pipeline runner with content-hashed output caching
+# Each stage is a function of its parameters and of the outputs of the stages it depends on.
+# The output of a stage is saved as JSON in the cache folder together with a hash of
+#   - the stage name, the source code of its function, of the modules it lists and its version,
+#   - its parameters (journal IDs, keyword lists, K, years, ...),
+#   - the content of the outputs of its upstream stages,
+# and the hashes of the files it writes besides its output (e.g. the Excel files for the manual review).
+# A stage whose saved hash matches and whose files are unchanged is skipped and its saved output is used instead.
+# Code the stage calls outside its function and modules is not hashed: bump the stage's version
+# when a change to it changes the output.
+# Stages that do not depend on each other run concurrently.
+
+
+class Stage:
+    # func(params, inputs) -> JSON-serialisable output,
+    # where inputs maps the name of each upstream stage to its output
+    # files are the paths of the files func writes besides its output,
+    # modules the names of the modules whose source is hashed with func, e.g. 'ere_openalex.keywords'
+    def __init__(self, name, func, depends_on=(), params=None, files=(), modules=(), version=1):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.params = params or {}
+        self.files = list(files)
+        self.modules = list(modules)
+        self.version = version
+
+
+def _hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# Source code of a stage function; the bytecode, or the name, when the source cannot be read
+# (e.g. a function defined in an interactive session, or an install without .py files)
+def _function_code(func):
+    if isinstance(func, functools.partial):
+        return [_function_code(func.func), repr(func.args), repr(sorted(func.keywords.items()))]
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, '__code__', None)
+        if code is not None:
+            return code.co_code.hex()
+        return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+
+
+# Hash of the source of a module, found without importing it (so without its dependencies)
+def _module_code(name):
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin or not os.path.exists(spec.origin):
+        raise ValueError(f"Cannot find the source of module {name}")
+    with open(spec.origin, 'rb') as f:
+        return _hash(f.read())
+
+
+def _stage_key(stage, upstream_hashes):
+    code = [_function_code(stage.func)] + [_module_code(name) for name in stage.modules]
+    return _hash(stage.name, code, stage.version, stage.params, upstream_hashes)
+
+
+# Hashes of the files written by a stage, None for a missing file
+def _file_hashes(stage):
+    hashes = []
+    for path in stage.files:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                hashes.append(_hash(f.read()))
+        else:
+            hashes.append(None)
+    return hashes
+
+
+def _output_path(cache_dir, name):
+    return os.path.join(cache_dir, f"{name}.json")
+
+
+def _hash_path(cache_dir, name):
+    return os.path.join(cache_dir, f"{name}.hash")
+
+
+# Whether the saved output of a stage was made with this key and its files are unchanged
+# The hash file holds the key, followed by the hashes of the stage's files, one per line
+def _is_current(stage, key, cache_dir):
+    output_path = _output_path(cache_dir, stage.name)
+    hash_path = _hash_path(cache_dir, stage.name)
+    if not os.path.exists(output_path) or not os.path.exists(hash_path):
+        return False
+    with open(hash_path, encoding='utf-8') as f:
+        saved = f.read().split()
+    file_hashes = _file_hashes(stage)
+    return None not in file_hashes and saved == [key] + file_hashes
+
+
+# Check that the stages have unique names, known dependencies and no cycles,
+# and return them in an order where every stage comes after its dependencies
+def topological_order(stages):
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    order = []
+    state = {}  # name -> 'visiting' or 'done'
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Cycle in stages: {' -> '.join(path + [name])}")
+        if name not in by_name:
+            raise ValueError(f"Unknown stage: {name} (needed by {path[-1]})")
+        state[name] = 'visiting'
+        for upstream in by_name[name].depends_on:
+            visit(upstream, path + [name])
+        state[name] = 'done'
+        order.append(by_name[name])
+
+    for stage in stages:
+        visit(stage.name, [])
+    return order
+
+
+# Run the stages, skipping those whose outputs are current.
+# A stage that raises saves nothing; the exception ends the run once the running stages finished.
+# 'only' limits the run to these stages and their upstream stages, 'force' reruns these stages.
+# Returns the outputs of all stages that were run or loaded, keyed by stage name
+def run(stages, cache_dir, max_workers=4, only=None, force=()):
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    os.makedirs(cache_dir, exist_ok=True)
+    order = topological_order(stages)
+
+    if only:
+        needed = set()
+        by_name = {stage.name: stage for stage in order}
+
+        def add(name):
+            if name not in needed:
+                needed.add(name)
+                for upstream in by_name[name].depends_on:
+                    add(upstream)
+
+        for name in only:
+            if name not in by_name:
+                raise ValueError(f"Unknown stage: {name}")
+            add(name)
+        order = [stage for stage in order if stage.name in needed]
+
+    outputs = {}
+    output_hashes = {}  # stage name -> hash of the content of its output
+    lock = threading.Lock()
+
+    def run_stage(stage):
+        with lock:
+            inputs = {name: outputs[name] for name in stage.depends_on}
+            upstream_hashes = [output_hashes[name] for name in stage.depends_on]
+        key = _stage_key(stage, upstream_hashes)
+
+        output_path = _output_path(cache_dir, stage.name)
+        hash_path = _hash_path(cache_dir, stage.name)
+        if stage.name not in force and _is_current(stage, key, cache_dir):
+            with open(output_path, 'rb') as f:
+                content = f.read()
+            print(f"Stage {stage.name} is current, skipped")
+            return json.loads(content), _hash(content)
+
+        print(f"Running stage {stage.name}...")
+        with profile_stage(f"stage {stage.name}"):
+            output = stage.func(stage.params, inputs)
+        content = json.dumps(output, default=str).encode('utf-8')
+
+        # Write the output before its hash, so an interrupted write is never taken as current
+        with open(output_path + ".tmp", 'wb') as f:
+            f.write(content)
+        os.replace(output_path + ".tmp", output_path)
+        with open(hash_path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write("\n".join([key] + [str(file_hash) for file_hash in _file_hashes(stage)]))
+        os.replace(hash_path + ".tmp", hash_path)
+        print(f"Stage {stage.name} finished")
+        # Continue with the output as read back from JSON, as a skipped stage would
+        return json.loads(content), _hash(content)
+
+    remaining = {stage.name: stage for stage in order}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            for name, stage in list(remaining.items()):
+                if all(upstream in outputs for upstream in stage.depends_on):
+                    running[executor.submit(run_stage, stage)] = name
+                    del remaining[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    print(f"Stage {name} failed, nothing saved: {future.exception()!r}")
+                output, output_hash = future.result()
+                with lock:
+                    outputs[name] = output
+                    output_hashes[name] = output_hash
+
+    return outputs
+
+
+# State of each stage without running anything: 'current', 'stale' (its code, parameters,
+# upstream outputs or files changed) or 'missing'. Stages after a stale or missing one are 'stale'
+def status(stages, cache_dir):
+    result = {}
+    output_hashes = {}
+    for stage in topological_order(stages):
+        output_path = _output_path(cache_dir, stage.name)
+        hash_path = _hash_path(cache_dir, stage.name)
+        if not os.path.exists(output_path) or not os.path.exists(hash_path):
+            result[stage.name] = 'missing'
+            continue
+        if any(result[upstream] != 'current' for upstream in stage.depends_on):
+            result[stage.name] = 'stale'
+            continue
+        if not _is_current(stage, _stage_key(stage, [output_hashes[upstream] for upstream in stage.depends_on]), cache_dir):
+            result[stage.name] = 'stale'
+            continue
+        with open(output_path, 'rb') as f:
+            output_hashes[stage.name] = _hash(f.read())
+        result[stage.name] = 'current'
+    return result
@@ -0,0 +1,258 @@
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Opt-in profiling of the stages of a run
+# Set the environment variable OPENALEX_PROFILE to a folder to profile any of the scripts, e.g.
+#   OPENALEX_PROFILE=profiles python -m ere_openalex time-window S4306500963 results.xlsx
+# Each stage (a function decorated with @profiled, or a block in `with profile_stage(...)`) gets
+#   - its number of calls, wall time and CPU time (wall minus CPU is mostly waiting on the network),
+#   - the functions taking most time inside it (cProfile, on 1 of every OPENALEX_PROFILE_SAMPLE calls,
+#     10 by default, so that stages called thousands of times are not slowed down by the profiler),
+#   - with OPENALEX_PROFILE_MEMORY=1, the peak of memory allocated during a call and the largest
+#     allocations still held at the end of its most memory-hungry call (tracemalloc).
+# At exit a report is written to the folder as JSON (to compare runs, see diff below) and as text.
+# When OPENALEX_PROFILE is not set, @profiled returns the function unchanged and
+# profile_stage returns an empty context, so profiling costs nothing.
+#
+# tracemalloc slows down allocation-heavy code many times over (and inflates the times above),
+# so memory is only traced on request. Its peak is that of the whole process: when stages run
+# at the same time in several threads (pipeline, queue), the peak of a stage includes the
+# allocations of the stages running alongside it; run them one at a time (--workers 1) for
+# the peak of each stage alone.
+#
+# Compare two reports, e.g. before and after a change:
+#   python -m ere_openalex profile-diff profiles/old.json profiles/new.json
+
+report_dir = os.environ.get('OPENALEX_PROFILE')
+enabled = bool(report_dir)
+trace_memory = enabled and bool(os.environ.get('OPENALEX_PROFILE_MEMORY'))
+sample_every = int(os.environ.get('OPENALEX_PROFILE_SAMPLE', '10'))
+top_count = 15
+
+# The profilers are only imported when profiling is enabled, to keep the start-up fast
+if enabled:
+    import cProfile
+    import pstats
+if trace_memory:
+    import tracemalloc
+    tracemalloc.start()
+
+_null_stage = contextlib.nullcontext()
+_lock = threading.Lock()
+_active = []  # stages running in any thread, while memory is traced
+_stages = {}  # name -> statistics of the stage
+_profiling = False  # whether a cProfile profiler is running
+_started = time.strftime('%Y%m%d-%H%M%S')
+
+
+def _stage_stats(name):
+    with _lock:
+        if name not in _stages:
+            _stages[name] = {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_bytes': 0,
+                'snapshot': None, 'profile': cProfile.Profile(), 'profiled_calls': 0
+            }
+        return _stages[name]
+
+
+class _ProfiledStage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.stats = _stage_stats(self.name)
+        with _lock:
+            self.stats['calls'] += 1
+            call_number = self.stats['calls']
+
+            # The peak is reset for this stage, so keep the peak reached so far for the
+            # stages already running (outer stages, and the stages of other threads)
+            if trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                for running in _active:
+                    running.peak = max(running.peak, peak)
+                tracemalloc.reset_peak()
+                self.start_memory = current
+                self.peak = current
+                _active.append(self)
+
+        # Only one cProfile profiler can run at a time, so nested stages and stages
+        # running at the same time in other threads are not profiled separately
+        global _profiling
+        self.profiler = None
+        with _lock:
+            if not _profiling and (call_number - 1) % sample_every == 0:
+                _profiling = True
+                self.profiler = self.stats['profile']
+        if self.profiler is not None:
+            self.profiler.enable()
+
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.thread_time() - self.start_cpu
+        global _profiling
+        if self.profiler is not None:
+            self.profiler.disable()
+            with _lock:
+                _profiling = False
+
+        with _lock:
+            self.stats['wall_seconds'] += wall
+            self.stats['cpu_seconds'] += cpu
+            if self.profiler is not None:
+                self.stats['profiled_calls'] += 1
+            take_snapshot = False
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                _active.remove(self)
+                for running in _active:
+                    running.peak = max(running.peak, peak)
+                peak = max(self.peak, peak) - self.start_memory
+                take_snapshot = peak > self.stats['peak_bytes']
+                if take_snapshot:
+                    self.stats['peak_bytes'] = peak
+        if take_snapshot:
+            # Only the snapshot is taken here; it is summarized when the report is written
+            snapshot = tracemalloc.take_snapshot()
+            with _lock:
+                self.stats['snapshot'] = snapshot
+        return False
+
+
+# Context manager measuring a block as a stage, e.g. `with profile_stage('excel_export'):`
+def profile_stage(name):
+    if not enabled:
+        return _null_stage
+    return _ProfiledStage(name)
+
+
+# Decorator measuring every call of a function as a stage, named after the function by default
+def profiled(name=None):
+    def decorate(func):
+        if not enabled:
+            return func
+        stage_name = name if isinstance(name, str) else func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _ProfiledStage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    # Allow both @profiled and @profiled('name')
+    if callable(name):
+        return decorate(name)
+    return decorate
+
+
+def _top_allocations(snapshot):
+    if snapshot is None:
+        return []
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)
+    ])
+    return [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size} B in {stat.count} blocks"
+            for stat in snapshot.statistics('lineno')[:top_count]]
+
+
+def _top_functions(profile):
+    try:
+        stats = pstats.Stats(profile)
+    except TypeError:
+        return []  # never enabled
+    rows = []
+    for (filename, lineno, function), (cc, nc, tottime, cumtime, callers) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{lineno}({function})",
+            'calls': nc, 'tottime': round(tottime, 4), 'cumtime': round(cumtime, 4)
+        })
+    rows.sort(key=lambda x: x['cumtime'], reverse=True)
+    return rows[:top_count]
+
+
+# Statistics of all stages, sorted by name so that two reports can be compared line by line
+def build_report():
+    with _lock:
+        stages = {
+            name: {
+                'calls': stats['calls'],
+                'profiled_calls': stats['profiled_calls'],
+                'wall_seconds': round(stats['wall_seconds'], 4),
+                'cpu_seconds': round(stats['cpu_seconds'], 4),
+                'wait_seconds': round(max(stats['wall_seconds'] - stats['cpu_seconds'], 0), 4),
+                'peak_bytes': stats['peak_bytes'],
+                'top_allocations': _top_allocations(stats['snapshot']),
+                'top_functions': _top_functions(stats['profile']),
+            }
+            for name, stats in sorted(_stages.items())
+        }
+    traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    return {
+        'command': sys.argv, 'started': _started, 'sample_every': sample_every,
+        'memory_traced': trace_memory, 'traced_peak_bytes': traced_peak, 'stages': stages
+    }
+
+
+def format_report(report):
+    lines = [f"Command: {' '.join(report['command'])}", f"Started: {report['started']}"]
+    if not report.get('memory_traced', True):
+        lines.append("Memory not traced (set OPENALEX_PROFILE_MEMORY=1)")
+    lines.append("")
+    lines.append(f"{'stage':40} {'calls':>8} {'wall s':>10} {'cpu s':>10} {'wait s':>10} {'peak MB':>10}")
+    for name, stage in report['stages'].items():
+        lines.append(f"{name:40} {stage['calls']:>8} {stage['wall_seconds']:>10.3f} {stage['cpu_seconds']:>10.3f} "
+                     f"{stage['wait_seconds']:>10.3f} {stage['peak_bytes'] / 1e6:>10.2f}")
+    for name, stage in report['stages'].items():
+        lines.append("")
+        lines.append(f"== {name} ({stage['profiled_calls']} of {stage['calls']} calls profiled)")
+        lines.append("Top functions by cumulative time:")
+        for row in stage['top_functions']:
+            lines.append(f"  {row['cumtime']:>10.4f} {row['tottime']:>10.4f} {row['calls']:>8}  {row['function']}")
+        lines.append("Largest allocations held at the end of the peak call:")
+        for allocation in stage['top_allocations']:
+            lines.append(f"  {allocation}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report():
+    if not _stages:
+        return None
+    os.makedirs(report_dir, exist_ok=True)
+    report = build_report()
+    path = os.path.join(report_dir, f"profile-{_started}-{os.getpid()}")
+    with open(path + ".json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    with open(path + ".txt", 'w', encoding='utf-8') as f:
+        f.write(format_report(report))
+    print(f"Profile saved to {path}.txt")
+    return path + ".json"
+
+
+if enabled:
+    atexit.register(write_report)
+
+
+# Changes of wall time, CPU time and peak memory of each stage between two reports
+def diff_reports(old, new):
+    lines = [f"{'stage':40} {'wall s':>18} {'cpu s':>18} {'peak MB':>18}"]
+    for name in sorted(set(old['stages']) | set(new['stages'])):
+        before = old['stages'].get(name, {})
+        after = new['stages'].get(name, {})
+        columns = []
+        for key, scale in [('wall_seconds', 1), ('cpu_seconds', 1), ('peak_bytes', 1e6)]:
+            a = before.get(key, 0) / scale
+            b = after.get(key, 0) / scale
+            columns.append(f"{a:>8.2f}->{b:<8.2f}")
+        lines.append(f"{name:40} " + " ".join(columns))
+    return "\n".join(lines)
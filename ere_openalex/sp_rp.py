@@ -0,0 +1,13 @@
+
+from . import api
+from .keywords import classify_works
+
+# Stated preference (SP) versus revealed preference (RP) works of a journal
+
+
+# Fetch all works of the journal and classify them as SP or RP works
+# Returns the term counts of each work and the number of SP and RP works by year
+def classify_journal(journal_id, include_abstract=False, strict=False):
+    works = api.get_works(journal_id, strict=strict)
+    keyword_counts, yearly_stats = classify_works(works, include_abstract)
+    return keyword_counts, dict(yearly_stats)
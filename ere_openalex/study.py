@@ -0,0 +1,163 @@
+
+from datetime import date
+
+from . import pipeline
+from .keywords import ere_keywords
+
+# The study as a pipeline of stages around the functions of the analyses
+#
+#   top_cited_works -> author_list -> author_works -> top_authors (Excel for the manual review)
+#   top_cited_works -> cited_by -> time_window
+#   sp_rp
+#   general_journals
+#
+# Each stage is skipped when its code, parameters and upstream outputs did not change since the
+# last run (see pipeline.py), and independent branches run concurrently.
+# The source of the analysis modules each stage calls (keywords.py, top_authors.py, time_window.py, ...)
+# is hashed with the stage, so editing them reruns the stages using them. api.py is not hashed, as a
+# change to it rarely changes the results and would recrawl everything: bump the version of the
+# fetching stages (top_cited_works, author_list, author_works, cited_by, sp_rp, general_journals)
+# when it does, and of top_cited_works when time_window.top_works changes.
+# The manual review of the top authors' publications stays manual:
+# 1. To look at an author's 20/25/30 most highly cited works in ERE fields
+# 2. Exclude citation counts in the textbooks for undergrads and popular science
+# 3. Exclude papers in science journals
+# The stages fetch strictly: a failed request fails the stage, which writes nothing to the cache,
+# instead of caching partial results as current.
+# The analysis modules are imported by the stages, so inspecting the cache starts quickly.
+
+# Set the parameters
+# Journal ids can be found in OpenAlex API
+ere_journal_ids = ["S4306500963"]  # the top ERE journals
+general_journal_ids = ["S199447588"]  # the general economics journals
+sp_rp_journal_ids = ["S4210216073"]  # the journals compared for SP versus RP
+keywords = ere_keywords
+papers_per_journal = 10  # K most highly cited papers of each ERE journal whose authors are ranked
+top_n_authors = 30
+years = list(range(date.today().year, 1993, -1))  # up to the current year, so each yearly update adds the newest year
+include_abstract = False
+output_file_top_authors = "the file that stores the top 30 authors' publications in ERE fields"
+
+# Fields of the top cited works kept between stages
+_work_fields = ['id', 'title', 'publication_year', 'cited_by_count', 'cited_by_api_url']
+
+
+# Top 1000 most cited works of each ERE journal
+def top_cited_works(params, inputs):
+    from . import api, time_window
+    return {
+        journal_id: [{field: work.get(field) for field in _work_fields} for work in api.get_top_cited_works(journal_id, time_window.top_works, strict=True)]
+        for journal_id in params['journal_ids']
+    }
+
+
+# Authors of the K most highly cited papers of each journal
+def author_list(params, inputs):
+    from . import top_authors
+    work_ids = []
+    for journal_id, works in inputs['top_cited_works'].items():
+        top_works = sorted(works, key=lambda x: x['cited_by_count'], reverse=True)[:params['papers_per_journal']]
+        work_ids.extend(work['id'] for work in top_works)
+    return top_authors.author_list(work_ids, strict=True)
+
+
+# Publications in ERE fields of each author in the author list
+def author_works(params, inputs):
+    from . import top_authors
+    result = {}
+    for author in inputs['author_list']:
+        author_id = author['author_url'].split('/')[-1]
+        if author_id in result:
+            continue
+        print(f"Processing author: {author['author_name']}")
+        result[author_id] = {
+            'author_name': author['author_name'],
+            'filtered_works': top_authors.get_author_ere_works(author_id, params['keywords'], params['include_abstract'], strict=True)
+        }
+        result[author_id]['missing_works'] = len(top_authors.missing_works[author_id])
+    return result
+
+
+# Rank the authors by total citations in ERE fields and save the top N for the manual review
+def top_authors(params, inputs):
+    author_citations = [
+        {
+            'author_id': author_id,
+            'author_name': author['author_name'],
+            'total_citations': sum(work.get('cited_by_count', 0) for work in author['filtered_works']),
+            'missing_works': author['missing_works']
+        }
+        for author_id, author in inputs['author_works'].items()
+    ]
+    ranking = sorted(author_citations, key=lambda x: x['total_citations'], reverse=True)[:params['top_n']]
+
+    from . import excel
+    excel.write_sheets(
+        [(author['author_name'], inputs['author_works'][author['author_id']]['filtered_works']) for author in ranking],
+        params['output_file']
+    )
+    print(f"Top {params['top_n']} authors' results saved to {params['output_file']}")
+    return ranking
+
+
+# Publication years of the citing works of each top cited work
+def cited_by(params, inputs):
+    from . import api
+    result = {}
+    for works in inputs['top_cited_works'].values():
+        for work in works:
+            if work['cited_by_api_url'] and work['id'] not in result:
+                cited_by_data = api.get_cited_by_data(work['cited_by_api_url'], select="id,publication_year", strict=True)
+                result[work['id']] = [{'publication_year': citation['publication_year']} for citation in cited_by_data]
+    return result
+
+
+# Top 100 and 500 total and mean citations of each journal for each year
+def time_window(params, inputs):
+    from . import time_window as time_window_analysis
+    return {
+        journal_id: [time_window_analysis.filter_and_calculate(works, inputs['cited_by'], year) for year in params['years']]
+        for journal_id, works in inputs['top_cited_works'].items()
+    }
+
+
+# SP and RP works of each journal by year
+def sp_rp(params, inputs):
+    from . import sp_rp as sp_rp_analysis
+    result = {}
+    for journal_id in params['journal_ids']:
+        keyword_counts, yearly_stats = sp_rp_analysis.classify_journal(journal_id, params['include_abstract'], strict=True)
+        result[journal_id] = yearly_stats
+    return result
+
+
+# Top 800 works of each general economics journal filtered by keywords
+def general_journals(params, inputs):
+    from . import general_journals as general_journals_analysis
+    return {
+        journal_id: general_journals_analysis.filtered_top_cited_works(journal_id, params['keywords'], params['include_abstract'], strict=True)
+        for journal_id in params['journal_ids']
+    }
+
+
+# Analysis modules whose source is hashed with the stages using them
+_matching_modules = ['ere_openalex.keywords', 'ere_openalex.abstract_matching']
+
+
+def build_stages():
+    return [
+        pipeline.Stage('top_cited_works', top_cited_works, params={'journal_ids': ere_journal_ids}),
+        pipeline.Stage('author_list', author_list, ['top_cited_works'], {'papers_per_journal': papers_per_journal},
+                       modules=['ere_openalex.top_authors']),
+        pipeline.Stage('author_works', author_works, ['author_list'], {'keywords': keywords, 'include_abstract': include_abstract},
+                       modules=['ere_openalex.top_authors'] + _matching_modules),
+        pipeline.Stage('top_authors', top_authors, ['author_works'], {'top_n': top_n_authors, 'output_file': output_file_top_authors},
+                       files=[output_file_top_authors], modules=['ere_openalex.excel']),
+        pipeline.Stage('cited_by', cited_by, ['top_cited_works']),
+        pipeline.Stage('time_window', time_window, ['top_cited_works', 'cited_by'], {'years': years},
+                       modules=['ere_openalex.time_window']),
+        pipeline.Stage('sp_rp', sp_rp, params={'journal_ids': sp_rp_journal_ids, 'include_abstract': include_abstract},
+                       modules=['ere_openalex.sp_rp'] + _matching_modules),
+        pipeline.Stage('general_journals', general_journals, params={'journal_ids': general_journal_ids, 'keywords': keywords, 'include_abstract': include_abstract},
+                       modules=['ere_openalex.general_journals'] + _matching_modules),
+    ]
@@ -0,0 +1,244 @@
+
+import json
+import os
+from datetime import date, timedelta
+
+from . import api
+from .profiling import profiled
+
+# Citation statistics of the most cited works of a journal by year
+
+# Fetch the top 1000 most cited works of each journal
+# Why not fetching all works: 1. fetching top 1000 is enough for the calculation
+# of top 500 mean citations for each year (each year's top 500 most cited works could
+# be different), 2. too many works will fully occupy the storage and will increase
+# the code running time
+top_works = 1000
+
+
+# Fetch the citations of the works, keyed by work ID
+def fetch_citations(works):
+    all_cited_by_data = {}
+    for work in works:
+        cited_by_api_url = work.get('cited_by_api_url')
+        if cited_by_api_url:
+            cited_by_data = api.get_cited_by_data(cited_by_api_url)
+            all_cited_by_data[work['id']] = cited_by_data
+            print(f"Total citations for {work['id']}: {len(cited_by_data)}")
+    return all_cited_by_data
+
+
+# Statistics of each year, computed from scratch
+def calculate(journal_id, years):
+    print("Fetching works...")
+    works = api.get_top_cited_works(journal_id, top_works)
+    print(f"Total works: {len(works)}")
+
+    all_cited_by_data = fetch_citations(works)
+
+    results = []
+    for year in years:
+        print(f"Calculating for year {year}...")
+        results.append(filter_and_calculate(works, all_cited_by_data, year))
+    return results
+
+
+# Filter works and citation data by year and calculate statistics
+@profiled
+def filter_and_calculate(works, all_cited_by_data, year):
+    filtered_works = []
+    for work in works:
+        publication_year = work['publication_year']
+        if publication_year <= year:
+            # Fetch citation data
+            work_id = work['id']
+            cited_by = all_cited_by_data.get(work_id, [])
+
+            # Filter citations by year
+            cited_by_count = sum(1 for citation in cited_by if citation['publication_year'] <= year)
+            work['filtered_cited_by_count'] = cited_by_count
+            filtered_works.append(work)
+
+    return calculate_top_statistics(filtered_works, year)
+
+
+# Calculate the statistics of a year from the works with their 'filtered_cited_by_count'
+def calculate_top_statistics(filtered_works, year):
+    # Sort by 'filtered_cited_by_count'
+    sorted_works = sorted(filtered_works, key=lambda x: x['filtered_cited_by_count'], reverse=True)
+
+    # Calculate the top 100 and 500 works' total and average citations
+    top_100 = sorted_works[:100] if len(sorted_works) >= 100 else sorted_works
+    total_cited_by_count_100 = sum(work['filtered_cited_by_count'] for work in top_100)
+    average_cited_by_count_100 = total_cited_by_count_100 / len(top_100) if len(top_100) > 0 else 0
+
+    top_500 = sorted_works[:500] if len(sorted_works) >= 500 else sorted_works
+    total_cited_by_count_500 = sum(work['filtered_cited_by_count'] for work in top_500)
+    average_cited_by_count_500 = total_cited_by_count_500 / len(top_500) if len(top_500) > 0 else 0
+
+    return {
+        'year': year,
+        'total_100': total_cited_by_count_100,
+        'average_100': average_cited_by_count_100,
+        'total_500': total_cited_by_count_500,
+        'average_500': average_cited_by_count_500,
+        'actual_count_100': len(top_100),
+        'actual_count_500': len(top_500)
+    }
+
+
+# Incremental update
+# Instead of re-crawling all citing works every year, the previous run's per-work citations
+# (citing work ID -> publication year, from which the histograms by year are built) and yearly
+# statistics are kept in a JSON state file. An update only fetches the citing works published
+# (or, with since_field="from_updated_date", updated) since shortly before the last run, skips
+# works whose cited_by_count did not change, and recomputes only the years that can be affected.
+
+# Earlier citing works can still be indexed after the last run, so look back a bit before it;
+# citing works fetched twice are only counted once
+# Citing works indexed even later are caught by comparing the stored citations with cited_by_count:
+# a work is fetched in full again when more citations are missing than at its last full fetch
+# (count_gap, as cited_by_count and the citing works found by the 'cites:' filter can differ)
+lookback_days = 365
+
+
+def load_state(state_file):
+    if os.path.exists(state_file):
+        with open(state_file, encoding='utf-8') as f:
+            return json.load(f)
+    return {'last_run': None, 'works': {}, 'statistics': {}}
+
+
+def save_state(state, state_file):
+    # Write to a temporary file first, so an interrupted run does not lose the previous state
+    with open(state_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(state_file + '.tmp', state_file)
+
+
+# Number of citations by publication year of the citing works
+def citation_histogram(citations):
+    histogram = {}
+    for citing_year in citations.values():
+        if citing_year is not None:
+            histogram[citing_year] = histogram.get(citing_year, 0) + 1
+    return histogram
+
+
+# Store the fetched citing works of a work, marking the years whose statistics change
+# If complete, cited_by_data holds all citing works, and the stored ones not in it are dropped
+# Returns the number of new or changed citations
+def _store_citations(stored, cited_by_data, mark_changed, complete=False):
+    changed = 0
+    fetched_ids = set()
+    for citation in cited_by_data:
+        fetched_ids.add(citation['id'])
+        previous_year = stored['citations'].get(citation['id'], citation['publication_year'])
+        if citation['id'] not in stored['citations'] or previous_year != citation['publication_year']:
+            stored['citations'][citation['id']] = citation['publication_year']
+            mark_changed(citation['publication_year'])
+            mark_changed(previous_year)
+            changed += 1
+    if complete:
+        for citation_id in [citation_id for citation_id in stored['citations'] if citation_id not in fetched_ids]:
+            mark_changed(stored['citations'].pop(citation_id))
+            changed += 1
+    return changed
+
+
+# Same statistics as filter_and_calculate, from the citation histograms of the works
+@profiled
+def filter_and_calculate_from_histograms(works, histograms, year):
+    filtered_works = []
+    for work in works:
+        if work['publication_year'] <= year:
+            histogram = histograms.get(work['id'], {})
+            cited_by_count = sum(count for citing_year, count in histogram.items() if citing_year <= year)
+            filtered_works.append({'id': work['id'], 'filtered_cited_by_count': cited_by_count})
+    return calculate_top_statistics(filtered_works, year)
+
+
+@profiled
+def update_statistics(journal_id, state_file, years, since_field="from_publication_date"):
+    state = load_state(state_file)
+    stored_works = state['works']
+    today = date.today()
+    since = None
+    if state['last_run']:
+        since = (date.fromisoformat(state['last_run']) - timedelta(days=lookback_days)).isoformat()
+
+    print("Fetching works...")
+    # Strict: with a partial list, the works missing from it would be dropped from the state
+    works = api.get_top_cited_works(journal_id, top_works, strict=True)
+    print(f"Total works: {len(works)}")
+
+    # The earliest year whose statistics can change; later years can change as well
+    first_changed_year = None
+
+    def mark_changed(year):
+        nonlocal first_changed_year
+        if year is not None and (first_changed_year is None or year < first_changed_year):
+            first_changed_year = year
+
+    # Works that left the top cited works
+    current_ids = {work['id'] for work in works}
+    for work_id in list(stored_works):
+        if work_id not in current_ids:
+            mark_changed(stored_works.pop(work_id)['publication_year'])
+
+    # Works whose citing works could not be fetched; they keep their previous cited_by_count,
+    # so the next update fetches them again
+    failed = []
+
+    for work in works:
+        work_id = work['id']
+        stored = stored_works.get(work_id)
+        cited_by_api_url = work.get('cited_by_api_url')
+
+        if stored is None:
+            # New work: fetch all its citing works
+            stored = {'publication_year': work['publication_year'], 'cited_by_count': None, 'count_gap': 0, 'citations': {}}
+            stored_works[work_id] = stored
+            mark_changed(work['publication_year'])
+        elif since_field == "from_publication_date" and stored['cited_by_count'] == work['cited_by_count']:
+            # No new citations
+            continue
+
+        if cited_by_api_url:
+            # cited_by_count is None until all citing works of the work were fetched once
+            full = since is None or stored['cited_by_count'] is None
+            try:
+                new_citations = 0
+                if not full:
+                    cited_by_data = api.get_cited_by_data(cited_by_api_url, f"{since_field}:{since}", select="id,publication_year", strict=True)
+                    new_citations = _store_citations(stored, cited_by_data, mark_changed)
+                    # Citing works published before the look-back window but indexed since
+                    full = work['cited_by_count'] - len(stored['citations']) > stored.get('count_gap', 0)
+                    if full:
+                        print(f"Citations of {work_id} still missing, fetching all citing works")
+                if full:
+                    cited_by_data = api.get_cited_by_data(cited_by_api_url, select="id,publication_year", strict=True)
+                    new_citations += _store_citations(stored, cited_by_data, mark_changed, complete=True)
+                    stored['count_gap'] = max(work['cited_by_count'] - len(stored['citations']), 0)
+            except api.FetchError as e:
+                print(f"Citations of {work_id} not updated: {e}")
+                failed.append(work_id)
+                continue
+            print(f"New citations for {work_id}: {new_citations}")
+        stored['cited_by_count'] = work['cited_by_count']
+
+    # Recompute only the years that can be affected, and the years not computed before
+    histograms = {work_id: citation_histogram(stored['citations']) for work_id, stored in stored_works.items()}
+    works_for_statistics = [{'id': work_id, 'publication_year': stored['publication_year']} for work_id, stored in stored_works.items()]
+    statistics = state['statistics']
+    for year in years:
+        if str(year) in statistics and (first_changed_year is None or year < first_changed_year):
+            continue
+        print(f"Calculating for year {year}...")
+        statistics[str(year)] = filter_and_calculate_from_histograms(works_for_statistics, histograms, year)
+
+    state['last_run'] = today.isoformat()
+    save_state(state, state_file)
+    if failed:
+        print(f"Citations of {len(failed)} works could not be fetched, their statistics are not up to date; run the update again")
+    return [statistics[str(year)] for year in years]
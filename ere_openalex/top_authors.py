@@ -0,0 +1,90 @@
+
+from . import api
+from .keywords import filter_works_by_keywords
+
+# Authors of the most cited ERE papers, ranked by their citations in ERE fields
+
+# Works shared by all authors, keyed by work ID
+# Co-authors have many works in common, so each work is fetched once and kept here
+works_store = {}
+
+# Whether a work in works_store matches the designated terms, keyed by work ID
+keyword_matches = {}
+
+# IDs of an author's works that could not be fetched, keyed by author ID
+# Their citations are missing from the author's total, so the ranking reports them
+missing_works = {}
+
+
+# Forget the stored works, e.g. between two jobs of a long-running worker
+def clear():
+    works_store.clear()
+    keyword_matches.clear()
+    missing_works.clear()
+
+
+# Authors of the works, one row per work and author
+def author_list(work_ids, strict=False):
+    results = []
+    for work_id in work_ids:
+        for author in api.get_authors_info(work_id.split('/')[-1], strict):
+            results.append({
+                'work_id': work_id,
+                'author_name': author['author_name'],
+                'author_url': author['author_url']
+            })
+    return results
+
+
+# Fetch the publications of an author
+# Works already fetched for a co-author are taken from works_store instead of being fetched again
+def get_author_works(author_id, strict=False):
+    work_ids = list(dict.fromkeys(api.get_author_work_ids(author_id, strict)))
+    missing = [work_id for work_id in work_ids if work_id not in works_store]
+    for work in api.get_works_by_ids(missing, strict=strict):
+        works_store.setdefault(work['id'], work)
+    missing_works[author_id] = [work_id for work_id in work_ids if work_id not in works_store]
+    if missing_works[author_id]:
+        print(f"Author {author_id}: {len(missing_works[author_id])} of {len(work_ids)} works not fetched, citations undercounted")
+    return [works_store[work_id] for work_id in work_ids if work_id in works_store]
+
+
+# Publications of an author in ERE fields
+# Each work shared with an earlier author is only checked once
+def get_author_ere_works(author_id, keywords, include_abstract=False, strict=False):
+    works = get_author_works(author_id, strict)
+    new_works = [work for work in works if work['id'] not in keyword_matches]
+    matched_ids = {work['id'] for work in filter_works_by_keywords(new_works, keywords, include_abstract)}
+    for work in new_works:
+        keyword_matches[work['id']] = work['id'] in matched_ids
+    return [work for work in works if keyword_matches[work['id']]]
+
+
+# Rank the authors of the author list by total citations in ERE fields
+# The same author appears once for each top paper, so each author ID is only processed once
+def rank_authors(authors, keywords, top_n=30, include_abstract=False):
+    unique_authors = {}
+    for author in authors:
+        author_id = author['author_url'].split('/')[-1]
+        if author_id not in unique_authors:
+            unique_authors[author_id] = author['author_name']
+    print(f"Unique authors: {len(unique_authors)} of {len(authors)} rows")
+
+    author_citations = []
+    for author_id, author_name in unique_authors.items():
+        print(f"Processing author: {author_name}")
+        filtered_works = get_author_ere_works(author_id, keywords, include_abstract)
+        author_citations.append({
+            'author_id': author_id,
+            'author_name': author_name,
+            'total_citations': sum(work.get('cited_by_count', 0) for work in filtered_works),
+            'missing_works': len(missing_works.get(author_id, [])),
+            'filtered_works': filtered_works
+        })
+
+    # Rank total citations, get top N authors with the highest citations
+    ranking = sorted(author_citations, key=lambda x: x['total_citations'], reverse=True)[:top_n]
+    undercounted = [author['author_name'] for author in ranking if author['missing_works']]
+    if undercounted:
+        print(f"Citations undercounted for {len(undercounted)} of the top {top_n} authors: {', '.join(undercounted)}")
+    return ranking
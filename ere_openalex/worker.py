@@ -0,0 +1,139 @@
+
+import sys
+import threading
+import time
+
+from . import coalescing, job_queue
+from .profiling import profile_stage
+
+# Worker processes for crawling through the job queue (job_queue.py)
+# Several workers, on one machine or on several machines sharing the queue file,
+# pull journal, work and author jobs and write their results into the same queue database.
+#
+# Example with four local workers:
+#   python -m ere_openalex queue --db crawl.sqlite enqueue top_cited_works S4306500963 --follow
+#   for i in 1 2 3 4; do python -m ere_openalex queue --db crawl.sqlite work --exit-when-idle & done; wait
+#   python -m ere_openalex queue --db crawl.sqlite status
+#   python -m ere_openalex queue --db crawl.sqlite export cited_by cited_by.jsonl
+#
+# Kinds of jobs (key -> result):
+#   top_cited_works  journal ID -> top 1000 most cited works (time window)
+#                    with {"follow": true} a cited_by job is enqueued for each work
+#   cited_by         work ID -> IDs and publication years of the citing works (time window)
+#   general_journal  journal ID -> top 800 works filtered by keywords (general economics journals)
+#   author_works     author ID -> the author's works (top authors)
+#   sp_rp_journal    journal ID -> SP and RP term counts of each work (SP versus RP)
+#   echo             any key -> the payload, to try out the queue without network access
+# The handlers fetch strictly: a failed request fails the job, which is retried with backoff
+# (job_queue.fail) instead of being completed with partial results.
+# The analysis modules are imported by the handlers, so the queue commands start quickly.
+
+
+def top_cited_works(conn, key, payload):
+    from . import api, time_window
+    works = api.get_top_cited_works(key, time_window.top_works, strict=True)
+    if payload.get('follow'):
+        for work in works:
+            if work.get('cited_by_api_url'):
+                job_queue.enqueue(conn, 'cited_by', work['id'].split('/')[-1], {'cited_by_api_url': work['cited_by_api_url']})
+    return works
+
+
+def cited_by(conn, key, payload):
+    from . import api
+    cited_by_api_url = payload.get('cited_by_api_url') or f"https://api.openalex.org/works?filter=cites:{key}"
+    # Only the publication year of the citing works is used to count citations by year
+    cited_by_data = api.get_cited_by_data(cited_by_api_url, select="id,publication_year", strict=True)
+    return [{'id': citation['id'], 'publication_year': citation['publication_year']} for citation in cited_by_data]
+
+
+def general_journal(conn, key, payload):
+    from . import general_journals, keywords
+    return general_journals.filtered_top_cited_works(key, payload.get('keywords', keywords.ere_keywords), payload.get('include_abstract', False), strict=True)
+
+
+def author_works(conn, key, payload):
+    from . import top_authors
+    return top_authors.get_author_works(key, strict=True)
+
+
+def sp_rp_journal(conn, key, payload):
+    from . import sp_rp
+    keyword_counts, yearly_stats = sp_rp.classify_journal(key, payload.get('include_abstract', False), strict=True)
+    return keyword_counts
+
+
+def echo(conn, key, payload):
+    time.sleep(payload.get('seconds', 0))
+    return payload
+
+
+handlers = {
+    'top_cited_works': top_cited_works,
+    'cited_by': cited_by,
+    'general_journal': general_journal,
+    'author_works': author_works,
+    'sp_rp_journal': sp_rp_journal,
+    'echo': echo,
+}
+
+
+# Forget what a job kept in memory for the rest of the run (coalesced fetches, the works of
+# top_authors): the results are saved in the queue, and a worker runs for thousands of jobs
+def _clear_caches():
+    coalescing.clear()
+    top_authors = sys.modules.get(f"{__package__}.top_authors")
+    if top_authors is not None:
+        top_authors.clear()
+
+
+# Keep renewing the lease of a job while its handler runs
+def _keep_lease(db_path, job_id, worker, lease_seconds, stop):
+    conn = job_queue.connect(db_path)
+    while not stop.wait(lease_seconds / 3):
+        if not job_queue.renew_lease(conn, job_id, worker, lease_seconds):
+            print(f"Lost the lease of {job_id}")
+            break
+    conn.close()
+
+
+# Pull and run jobs until max_jobs are done, or if exit_when_idle until no job is left to run:
+# a worker with nothing to claim waits for the retries and the jobs leased by other workers
+# (which may fail, or enqueue new jobs) before leaving
+def work(db_path, kinds=None, max_jobs=None, exit_when_idle=False, lease_seconds=600, poll_seconds=5):
+    conn = job_queue.connect(db_path)
+    worker = job_queue.worker_name()
+    done = 0
+
+    while max_jobs is None or done < max_jobs:
+        job = job_queue.claim(conn, worker, kinds, lease_seconds)
+        if job is None:
+            available_at = job_queue.next_available(conn, kinds)
+            if available_at is None:
+                if exit_when_idle:
+                    break
+                time.sleep(poll_seconds)
+            else:
+                time.sleep(min(poll_seconds, max(available_at - time.time(), 0.1)))
+            continue
+
+        print(f"{worker} processing {job['job_id']} (attempt {job['attempts']})")
+        stop = threading.Event()
+        keeper = threading.Thread(target=_keep_lease, args=(db_path, job['job_id'], worker, lease_seconds, stop), daemon=True)
+        keeper.start()
+        try:
+            with profile_stage(f"job {job['kind']}"):
+                result = handlers[job['kind']](conn, job['key'], job['payload'])
+        except Exception as e:
+            print(f"{job['job_id']} failed: {e!r}")
+            job_queue.fail(conn, job['job_id'], worker, repr(e))
+        else:
+            job_queue.complete(conn, job['job_id'], worker, result)
+            done += 1
+        finally:
+            stop.set()
+            keeper.join()
+            _clear_caches()
+
+    conn.close()
+    return done